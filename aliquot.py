@@ -59,9 +59,22 @@ LICENSE
 
     # get the important stuff from primality.py
 
-from math import log
+from math import log, isqrt
+from array import array
+from functools import lru_cache
 from primality import primes, multiplicative, square_free, totient
 
+@lru_cache(maxsize=1<<20)
+def _s(n:int) -> int:
+    """cached sum of proper divisors
+
+    Aliquot trajectories started from different seeds frequently
+    cross, and the replay pass revisits every term found during cycle
+    detection, so identical values would otherwise be refactored many
+    times over.
+    """
+    return primes.s(n)
+
 class Aliquot(object):
 
     status = 0
@@ -102,13 +115,25 @@ class Aliquot(object):
 
         RETURN VALUE
 
-            a list containing the head of the aliquot sequence
+            the head of the aliquot sequence, as an array of machine
+            integers when every term fits in a signed 64-bit word, or
+            as an ordinary list otherwise
 
         SIDE EFFECTS
 
             the status value is updated and may be queried to
             determine the reason for termination.
- 
+
+        ALGORITHM
+
+            Cycles are found using Brent's tortoise-and-hare method,
+            which keeps just two terms in hand at any moment instead
+            of a set of every term seen so far.  A first pass detects
+            the cycle (if there is one) in constant extra memory; a
+            second pass replays the sequence from the seed to build
+            the list of leading terms.  The price is a second round of
+            calls to primes.s, but the unbounded set of large integers
+            (and the hashing that went with it) is gone.
         """
         def warning(msg):
             """display a warning message"""
@@ -119,54 +144,174 @@ class Aliquot(object):
         if not isinstance(n, int):
             raise TypeError
         n = abs(n)      # force this to be non-negative
-        seq = []
-        domain = set()
-        old_pmax = primes.odd_primes_list[-1]
-        while True:
-            n = primes.s(n)             # sum of proper divisors
-            seq.append(n)
-
-                # Check for normal completion
-            if n == 0:
-                break                       # terminating sequence
-            if n in domain:
-                cls.status = cls.PERIODIC
-                return seq                  # periodic sequence
-
-                # Check for abnormal completion
-            if len(seq) >= max_length:
-                warning(f"Maximum length {max_length} exceeded.")
-                cls.status = cls.LENGTH_EXCEEDED
-                return seq
-            if n > largest:
-                warning(f"Largest value {n} > {largest}")
-                cls.status = cls.LARGEST_EXCEEDED
-                return seq
-            pmax = primes.odd_primes_list[-1]
-            if pmax > largest_prime:
-                warning(f"Largest prime {pmax} > {largest_prime}")
-                cls.status = cls.SIEVE_OVERFLOW
-                return seq
-
-                # additional warnings (non-fatal)
-            if pmax > old_pmax:
+        if n == 0:
+                # the sum of proper divisors of 0 is undefined
+                # (primes.s(0) is nan), so the orbit cannot start.
+                # Reject the seed with the type error that sigma's
+                # own check raised on the second step, rather than
+                # letting the nan trip the bit-length guard below.
+            raise TypeError
+
+            # PHASE 1 - Brent's cycle detection
+            #
+            # Only the hare breaks new ground, so the sieve grows and
+            # the fatal bounds are met in orbit order, just as they
+            # were when every term was recorded in a set.  The
+            # tortoise parks at positions 2^k - 1, so a cycle with
+            # period lam and preperiod mu is caught at hare step
+            # 2^k - 1 + lam for the smallest 2^k with 2^k >= lam and
+            # 2^k - 1 >= mu -- just under 3*(mu + lam) when lam sits
+            # barely above a power of two.  Any cycle reportable
+            # within max_length terms (mu + lam <= max_length) is
+            # therefore found within 3*max_length + 1 hare steps.
+
+            # the sieve extends this list in place, so one binding
+            # serves for the whole run
+        opl = primes.odd_primes_list
+        old_pmax = opl[-1]
+        fatal = None                    # a fatal status, if any
+        found_cycle = False
+            # comparing bit lengths is a cheap scalar test that rules
+            # out most full big-integer comparisons against largest
+        largest_bits = largest.bit_length()
+        cap = 3 * max_length + 1
+        power = lam = 1
+        tortoise = n
+        hare = _s(n)                    # sum of proper divisors
+        steps = 1                       # orbit index of the hare
+        while hare:                     # a zero ends the sequence
+            if hare == tortoise:
+                found_cycle = True
+                break
+            pmax = opl[-1]
+            if (hare.bit_length() >= largest_bits and hare > largest) \
+                    or pmax > largest_prime:
+                    # one combined guard on the hot path; sort out
+                    # which bound failed only in this cold branch
+                fatal = cls.LARGEST_EXCEEDED if hare > largest \
+                    else cls.SIEVE_OVERFLOW
+                break
+
+                # additional warnings (non-fatal) -- do not even build
+                # the message unless it will be shown
+            if warnings and pmax > old_pmax and steps <= max_length:
                 warning(f"sieved up to {pmax} from {old_pmax}")
             old_pmax = pmax
 
-                # add the new value to the domain
-            domain.add(n)
+            if steps >= cap:
+                break                   # no cycle within reach
+            if power == lam:            # time to teleport the tortoise
+                tortoise = hare
+                power *= 2
+                lam = 0
+            hare = _s(hare)
+            steps += 1
+            lam += 1
+
+            # Classify the outcome and decide how many terms to keep.
+
+        if hare == 0:
+            if steps <= max_length:
+                status, count = cls.TERMINATING, steps
+            else:
+                status, count = cls.LENGTH_EXCEEDED, max_length
+        elif fatal is not None:
+            if steps < max_length:
+                status, count = fatal, steps
+            else:
+                status, count = cls.LENGTH_EXCEEDED, max_length
+        elif found_cycle:
+                # lam is the period; now locate mu, the index where
+                # the cycle begins -- all of these values have already
+                # been checked against the bounds above
+            mu = 0
+            tortoise = n
+            hare = n
+            for _ in range(lam):
+                hare = _s(hare)
+            while tortoise != hare:
+                tortoise = _s(tortoise)
+                hare = _s(hare)
+                mu += 1
+                # the first repeated term appears at index mu+lam,
+                # except that the seed itself is not one of the
+                # returned terms
+            count = mu + lam if mu else lam + 1
+            if count <= max_length:
+                status = cls.PERIODIC
+            else:
+                status, count = cls.LENGTH_EXCEEDED, max_length
+        else:
+            status, count = cls.LENGTH_EXCEEDED, max_length
+
+            # PHASE 2 - replay the validated leading terms
 
-        cls.status = cls.TERMINATING    # sequence terminates with zero
+        seq = array("q")            # compact signed 64-bit storage
+        x = n
+        for _ in range(max(count, 1)):
+            x = _s(x)
+            if x.bit_length() > 63 and not isinstance(seq, list):
+                seq = list(seq)     # term too wide for a machine word
+            seq.append(x)
+
+        if warnings:
+            if status == cls.LENGTH_EXCEEDED:
+                warning(f"Maximum length {max_length} exceeded.")
+            elif status == cls.LARGEST_EXCEEDED:
+                warning(f"Largest value {x} > {largest}")
+            elif status == cls.SIEVE_OVERFLOW:
+                warning(f"Largest prime {opl[-1]} > {largest_prime}")
+        cls.status = status
         return seq
 
+    @classmethod
+    def aliquot_sequences(cls, ns, max_length=50, largest=100000,
+                          largest_prime=100000, warnings=True):
+        """
+        evaluate the aliquot sequences of several seeds
+
+        REQUIRED ARGUMENTS
+
+            ns - an iterable of integers
+
+        OPTIONAL ARGUMENTS
+
+            as for aliquot_sequence
+
+        RETURN VALUE
+
+            a dictionary mapping each seed to the head of its
+            aliquot sequence
+
+        DESCRIPTION
+
+            The sieve is extended once up front instead of piecemeal
+            inside each run, and all runs share the cache of sums of
+            proper divisors, so seeds whose trajectories merge do not
+            repeat each other's factoring work.  The status value
+            reflects the last seed processed.
+        """
+        primes.sieve(min(isqrt(largest), largest_prime))
+        sequences = {}
+        for seed in ns:
+            sequences[seed] = cls.aliquot_sequence(
+                seed, max_length=max_length, largest=largest,
+                largest_prime=largest_prime, warnings=warnings)
+        return sequences
+
+    @classmethod
+    def clear_cache(cls):
+        """empty the cache of sums of proper divisors"""
+        _s.cache_clear()
+
 def pad_terminating_seq(seq, length):
     """
     pad the result with zeros
 
     This will modify the original sequence.
     """
-    while len(seq) < length:
-        seq.append(0)
+    if len(seq) < length:
+        seq.extend([0] * (length - len(seq)))
 
 def pad_periodic_seq(seq, length):
     """
@@ -174,26 +319,44 @@ def pad_periodic_seq(seq, length):
 
     This will modify the original sequence.
     """
+    first_at = {}               # first position of each term
+    for position, term in enumerate(seq):
+        if term not in first_at:
+            first_at[term] = position
     last_term = seq[-1]
-    index = -2
-    while seq[index] != last_term:
-        index -= 1
-    period = abs(index) - 1
+        # one hash lookup in place of a backward scan full of
+        # big-integer comparisons
+    period = len(seq) - 1 - first_at[last_term]
+    index = -(period + 1)
     diagnoses = {1:"perfect", 2:"amicable"}
     diagnosis = diagnoses.get(period, "sociable")
     print(f"Period {period}: repeats with {diagnosis} number {last_term}")
-    while len(seq) < length:
-        seq.append(seq[index])
+        # extend with whole copies of the repeating block instead of
+        # appending one term at a time
+    need = length - len(seq)
+    if need > 0:
+        cycle = seq[index:]
+        q, r = divmod(need, len(cycle))
+        seq.extend(cycle * q + cycle[:r])
 
 def plot(seq, title="aliquot sequence plot", logarithmic=False):
     """plot an aliquot sequence"""
-    import matplotlib.pyplot as plt
-    import matplotlib.ticker as ticker
-
-    foolog = lambda x: x if x > 0 else 0.1
+    if plot._plt is None:       # import lazily, but just once
+        import matplotlib.pyplot
+        import matplotlib.ticker
+        import numpy
+        plot._plt = matplotlib.pyplot
+        plot._ticker = matplotlib.ticker
+        plot._np = numpy        # matplotlib requires numpy anyway
+    plt = plot._plt
+    ticker = plot._ticker
+    np = plot._np
 
     xs = list(range(len(seq)))
-    ys = list(map(foolog, seq)) if logarithmic else seq
+    ys = np.asarray(seq, dtype=np.float64)
+    if logarithmic:
+            # clip in one vectorized pass; a log scale cannot plot zero
+        np.maximum(ys, 0.1, out=ys)
     plt.title(title)
     plt.xlabel("index k")
     plt.ylabel("term log(a(k),10)" if logarithmic else "a(k)")
@@ -208,6 +371,10 @@ def plot(seq, title="aliquot sequence plot", logarithmic=False):
         plt.figtext(0.99, 0.01, NOTE, horizontalalignment='right') 
     plt.show()
 
+plot._plt = None
+plot._ticker = None
+plot._np = None
+
 def main(argv):
     """parse arguments"""
     import argparse
@@ -238,7 +405,7 @@ def main(argv):
                                    largest=args.largest_value,
                                    largest_prime=args.largest_prime)
 
-    print(seq)
+    print(list(seq))
     status = Aliquot.status
     if status == Aliquot.LENGTH_EXCEEDED:
         print("The sequence does not repeat or terminate after",
@@ -97,23 +97,50 @@ LICENSE
     SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
 
-from math import sqrt, gcd, atan, pi, isnan, isqrt
+from math import sqrt, gcd, atan2, pi, isnan, isqrt
     # NOTE: math.isqrt() requires Python 3.8 or later
 
 from numbers import Complex
 from fractions import Fraction
+from functools import lru_cache
 
-    # NOTE: primality.py is imported by class GaussianInt if it is
-    #   needed.
+    # NOTE: primality.py is imported lazily, on the first primality
+    #   test, via _get_primality below.
+
+_PRIMALITY = None       # the primality module, bound on first use
+
+def _get_primality():
+    """import primality on first use and reuse it afterwards"""
+    global _PRIMALITY
+    if _PRIMALITY is None:
+        import primality
+        _PRIMALITY = primality
+    return _PRIMALITY
 
 def sgn(x):
     """the signum function
 
     sgn(x) is 1 if x>0, 0 if x=0, and -1 if x<0
+
+    Python booleans are the integers 0 and 1, so the difference below
+    lands in {-1, 0, 1} without any branching.
+    """
+    return (x > 0) - (x < 0)
+
+def _mul_raw(a1, b1, c1, a2, b2, c2):
+    """multiply raw triples (a+bi)/c using Gauss's trick"""
+    k1 = a2 * (a1 + b1)
+    k2 = a1 * (b2 - a2)
+    k3 = b1 * (a2 + b2)
+    return k1 - k3, k1 + k2, c1 * c2
+
+def _sq_raw(a, b, c):
+    """square a raw triple (a+bi)/c
+
+    (a+bi)^2 = (a-b)(a+b) + 2abi -- one multiplication and an
+    addition in place of two squarings.
     """
-    if x>0:
-        return 1
-    return -1 if x<0 else 0
+    return (a + b) * (a - b), 2 * a * b, c * c
 
 class GaussianFrac(Complex):
     """the class Q(i) of Gaussian rational numbers
@@ -136,9 +163,19 @@ class GaussianFrac(Complex):
             raise ZeroDivisionError("The value of c cannot be zero.")
 
             # normalization
-        d = gcd(a, b, c)        # okay since c != 0
-        if sgn(c) != sgn(d):
-            d = -d
+        if c == 1:              # a Gaussian integer: already canonical
+            self._a = a
+            self._b = b
+            self._c = 1
+            self._normsq = None
+            self._hash = None
+            self._complex = None
+            return
+        d = gcd(a, b)           # staged two-argument gcds: when the
+        if d != 1:              #   parts are already coprime, the gcd
+            d = gcd(d, c)       #   against c is 1 and can be skipped
+        if c < 0:               # math.gcd is never negative, so one
+            d = -d              #   comparison settles the sign of d
         a //= d
         b //= d
         c //= d         # c>0
@@ -146,6 +183,25 @@ class GaussianFrac(Complex):
         self._a = a
         self._b = b
         self._c = c
+        self._normsq = None     # cache for the norm squared
+        self._hash = None       # cache for the hash
+        self._complex = None    # cache for the complex cast
+
+    @classmethod
+    def _make_raw(cls, a:int, b:int, c:int=1):
+        """build an instance directly, skipping normalization
+
+        For internal use only: the caller warrants that (a, b, c) is
+        already in canonical form (c > 0 and gcd(a, b, c) = 1).
+        """
+        u = object.__new__(cls)
+        u._a = a
+        u._b = b
+        u._c = c
+        u._normsq = None
+        u._hash = None
+        u._complex = None
+        return u
 
     def __repr__(self):
         """representation"""
@@ -169,12 +225,16 @@ class GaussianFrac(Complex):
         return f"({self._a}-{-self._b}i)/{self._c}"
 
     def __hash__(self):
-        """return the hash"""
-        if self._b == 0:            # imaginary part is zero
-            if self._c == 1:
-                return hash(self._a)
-            return hash(Fraction(self._a, self._c))
-        return hash((self._a, self._b, self._c))
+        """return the hash (computed once, then cached)"""
+        if self._hash is None:
+            if self._b == 0:        # imaginary part is zero
+                if self._c == 1:
+                    self._hash = hash(self._a)
+                else:
+                    self._hash = hash(Fraction(self._a, self._c))
+            else:
+                self._hash = hash((self._a, self._b, self._c))
+        return self._hash
 
     @property
     def numerator(self):
@@ -195,6 +255,8 @@ class GaussianFrac(Complex):
     @property
     def real(self) -> (Fraction, int):
         """return the real part"""
+        if self._c == 1:        # no Fraction (and no gcd) needed
+            return self._a
         result = Fraction(self._a, self._c)
         if result.denominator == 1:
             return result.numerator
@@ -203,17 +265,29 @@ class GaussianFrac(Complex):
     @property
     def imag(self) -> (Fraction, int):
         """return the imaginary part"""
+        if self._c == 1:        # no Fraction (and no gcd) needed
+            return self._b
         result = Fraction(self._b, self._c)
         if result.denominator == 1:
             return result.numerator
         return result
 
     def normsq(self) -> (Fraction, int):
-        """square of the Euclidean norm"""
-        result = Fraction(self._a ** 2 + self._b ** 2, self._c ** 2)
-        if result.denominator == 1:
-            return result.numerator
-        return result
+        """square of the Euclidean norm
+
+        The value is computed once and cached on the instance.
+        """
+        if self._normsq is None:
+            if self._c == 1:    # a Gaussian integer: no Fraction needed
+                self._normsq = self._a * self._a + self._b * self._b
+            else:
+                result = Fraction(self._a * self._a
+                                      + self._b * self._b,
+                                  self._c * self._c)
+                if result.denominator == 1:
+                    result = result.numerator
+                self._normsq = result
+        return self._normsq
 
     def __abs__(self):
         """complex absolute value (or 2-norm or Euclidean norm)"""
@@ -228,20 +302,10 @@ class GaussianFrac(Complex):
         """
         if self.is_zero:
             return float('nan')         # undefined at zero
-        if self._a == 0:                # vertical tangent
-            return pi/2 if self._b > 0 else 3*pi/2
-
-        alpha = atan(abs(self._b / self._a))    # reference angle
-        if self._b >= 0:                # upper half plane
-            if self._a > 0:                 # first quadrant
-                return alpha
-            else:                           # second quadant
-                return pi - alpha
-        # else:                           # lower half plane
-        if self._a < 0:                     # third quadrant
-            return pi + alpha
-        #   else:                           # fourth quadrant
-        return 2*pi - alpha
+        theta = atan2(self._b, self._a)     # full-quadrant arctangent
+        if theta < 0:                   # atan2 maps into (-pi, pi]
+            theta += 2*pi
+        return theta
 
     def argd(self) -> float:
         """angle of inclination in degrees
@@ -271,19 +335,48 @@ class GaussianFrac(Complex):
 
         return self.arg() * 180 / pi
 
+    @staticmethod
+    def _normalized(a, b, c):
+        """reduce a raw (a+bi)/c, c > 0, and unwrap integer results
+
+        One staged gcd pass takes the place of the constructor's
+        validation and normalization; results with denominator 1 come
+        back as an int or a GaussianInt, as elsewhere.
+        """
+        g = gcd(a, b)
+        if g != 1:
+            g = gcd(g, c)
+            if g > 1:
+                a //= g
+                b //= g
+                c //= g
+        if c == 1:
+            if b == 0:
+                return a
+            return GaussianInt._make_raw(a, b)
+        return GaussianFrac._make_raw(a, b, c)
+
     def conjugate(self):
         """complex conjugate"""
-        return GaussianFrac(self._a, - self._b, self._c)
+            # conjugation preserves normalization: no gcd needed
+        return GaussianFrac._make_raw(self._a, - self._b, self._c)
 
     def __complex__(self):
-        """cast to complex"""
-        return (self._a + self._b * 1j) / self._c
+        """cast to complex (computed once, then cached)"""
+        if self._complex is None:
+            self._complex = (self._a + self._b * 1j) / self._c
+        return self._complex
 
     def __eq__(self, other):
         """test equality"""
         if isinstance(other, GaussianFrac):
             return self._a == other._a and self._b == other._b \
                 and self._c == other._c
+        if isinstance(other, int):      # no complex arithmetic needed
+            return self._b == 0 and self._c == 1 and self._a == other
+        if isinstance(other, Fraction): # both sides are normalized
+            return self._b == 0 and self._a == other.numerator \
+                and self._c == other.denominator
         return complex(self) == complex(other)
 
     @property
@@ -304,10 +397,7 @@ class GaussianFrac(Complex):
             a = self._a * other._c + self._c * other._a
             b = self._b * other._c + self._c * other._b
             c = self._c * other._c
-            result = GaussianFrac(a, b, c)
-            if result.denominator == 1:
-                return result.numerator
-            return result
+            return GaussianFrac._normalized(a, b, c)
         if isinstance(other, int):
             other = GaussianFrac(other)
             return self + other
@@ -331,7 +421,8 @@ class GaussianFrac(Complex):
 
     def __neg__(self):
         """additive inverse"""
-        return GaussianFrac(-self._a, -self._b, self._c)
+            # negation preserves normalization: no gcd needed
+        return GaussianFrac._make_raw(-self._a, -self._b, self._c)
 
     def __mul__(self, other):
         """multiplication"""
@@ -340,13 +431,16 @@ class GaussianFrac(Complex):
         if self.is_one:
             return other
         if isinstance(other, GaussianFrac):
-            a = self._a * other._a - self._b * other._b
-            b = self._a * other._b + self._b * other._a
+                # Gauss's trick: three multiplications instead of four
+                #   (a1+b1 i)(a2+b2 i) = (k1-k3) + (k1+k2)i  where
+                #   k1 = a2(a1+b1), k2 = a1(b2-a2), k3 = b1(a2+b2)
+            k1 = other._a * (self._a + self._b)
+            k2 = self._a * (other._b - other._a)
+            k3 = self._b * (other._a + other._b)
+            a = k1 - k3
+            b = k1 + k2
             c = self._c * other._c
-            result = GaussianFrac(a, b, c)
-            if result.denominator == 1:
-                return result.numerator
-            return result
+            return GaussianFrac._normalized(a, b, c)
         if isinstance(other, int):
             other = GaussianFrac(other)
             return self * other
@@ -371,14 +465,19 @@ class GaussianFrac(Complex):
         1 / ((a+bi)/c) = c / (a+bi)
                        = c (a-bi) / ((a+bi)(a-bi))
                        = (ac - bci) / (a^2 + b^2)
+
+        Writing a=g*a' and b=g*b' with g=gcd(a,b), this reduces to
+        (a'c - b'ci) / (g (a'^2 + b'^2)).  Dividing out g before
+        squaring keeps the sum of squares small and leaves less for
+        the constructor's normalization to undo.
         """
         if self.is_zero:
             raise ZeroDivisionError("divide by zero")
         a, b, c = self._a, self._b, self._c
-        result = GaussianFrac(a*c, -b*c, a**2 + b**2)
-        if result.denominator == 1:
-            return result.numerator
-        return result
+        g = gcd(a, b)
+        a //= g
+        b //= g
+        return GaussianFrac._normalized(a*c, -b*c, g * (a*a + b*b))
 
     def __truediv__(self, other):
         """multiplication"""
@@ -409,26 +508,30 @@ class GaussianFrac(Complex):
         if e < 0:
             return self.reciprocal ** -e
 
-        stack = []
-        f = 1
+        if e == 2:              # plain squaring: skip the loop
+            return self._square()
+
+            # right-to-left binary exponentiation over raw (a, b, c)
+            # triples: no stack, no intermediate GaussianFrac, and
+            # normalization is deferred to the very end
+        ra, rb, rc = 1, 0, 1
         a, b, c = self._a, self._b, self._c
-        while f <= e:
-                # update the stack
-            stack.append((f, GaussianFrac(a, b, c)))
-            f *= 2              # double f
-                # square the top of the stack
-            a2 = a**2 - b**2
-            b2 = 2*a*b
-            c2 = c**2
-                # update the current value
-            a, b, c = a2, b2, c2
-        result = 1
-        while e > 0:
-            f, u = stack.pop()
-            if f <= e:          # 1 in the binary expansion of e
-                result *= u
-                e -= f
-        return result
+        while e:
+            if e & 1:           # 1 in the binary expansion of e
+                ra, rb, rc = _mul_raw(ra, rb, rc, a, b, c)
+            e >>= 1
+            if e:
+                a, b, c = _sq_raw(a, b, c)
+        return GaussianFrac._normalized(ra, rb, rc)
+
+    def _square(self):
+        """square the value
+
+        Uses the identity (a+bi)^2 = (a-b)(a+b) + 2abi, trading one
+        of the two squarings for an addition and a subtraction.
+        """
+        a, b, c = _sq_raw(self._a, self._b, self._c)
+        return GaussianFrac._normalized(a, b, c)
 
     def __pow__(self, other):
         """exponentiation"""
@@ -538,23 +641,61 @@ GaussianFrac.rounding_method()      # set rounding method to round
 class GaussianInt(GaussianFrac):
     """Gaussian integers"""
 
-    PRIMALITY = False
-    _pr = None
-    _primes = None
+    _pool = {}          # interned instances with |a|, |b| <= 1
+
+    def __new__(cls, a:int=0, b:int=0):
+        """allocator -- small values are interned
+
+        Zero, the four units and the other tiny Gaussian integers
+        turn up constantly as results of negation, conjugation and
+        unit tests; reusing one instance per value skips repeated
+        construction and keeps their caches warm.
+        """
+        if cls is GaussianInt and type(a) is int and type(b) is int \
+                and -1 <= a <= 1 and -1 <= b <= 1:
+            u = cls._pool.get((a, b))
+            if u is None:
+                u = super().__new__(cls)
+                cls._pool[(a, b)] = u
+            return u
+        return super().__new__(cls)
 
     def __init__(self, a:int=0, b:int=0):
         """constructor"""
+        if "_a" in self.__dict__:
+            return          # an interned instance, already built
         super().__init__(a, b)
 
-    @classmethod
-    def _set_primality(cls):
-        """private class method called for multiplicative number theory"""
-        if cls.PRIMALITY:
-            return                  # primes has been imported
-        cls.PRIMALITY = True
-        import primality
-        cls._pr = primality
-        cls._primes = primality.primes
+    def __add__(self, other):
+        """add, staying inside the Gaussian integers
+
+        Sums of Gaussian integers need no denominator bookkeeping and
+        no gcd, so the general path in GaussianFrac is bypassed.
+        """
+        if isinstance(other, GaussianInt):
+            a = self._a + other._a
+            b = self._b + other._b
+            if b == 0:
+                return a
+            return GaussianInt._make_raw(a, b)
+        return super().__add__(other)
+
+    def __mul__(self, other):
+        """multiply, staying inside the Gaussian integers
+
+        Gauss's three-multiplication trick, with the normalization gcd
+        skipped: a product of Gaussian integers is already canonical.
+        """
+        if isinstance(other, GaussianInt):
+            k1 = other._a * (self._a + self._b)
+            k2 = self._a * (other._b - other._a)
+            k3 = self._b * (other._a + other._b)
+            a = k1 - k3
+            b = k1 + k2
+            if b == 0:
+                return a
+            return GaussianInt._make_raw(a, b)
+        return super().__mul__(other)
 
     @property
     def is_unit(self) -> bool:
@@ -565,14 +706,11 @@ class GaussianInt(GaussianFrac):
 
         Note that Python treats the boolean True as 1.
         """
-        i = GaussianInt(0, 1)
-        return self in {-1, 1, i, -i}
+        return self in _GAUSSIAN_UNITS
 
     def is_associate(self, other) -> bool:
         """test whether the numbers are associates"""
-        u = self / other
-        i = GaussianInt(0, 1)
-        return u in {-1, 1, i, -i}
+        return self / other in _GAUSSIAN_UNITS
 
     @property
     def is_prime(self) -> bool:
@@ -634,29 +772,81 @@ class GaussianInt(GaussianFrac):
                         17x17 is composite because 17 % 4 = 1.
                         (4+i)(4-i) = 17
         """
-        self._set_primality()           # primality.py is required
-        normsq = self.normsq()
-
-            # STEP 1
-            # if the norm-square is prime, then the number is prime
-        if self._primes.is_prime(normsq):
-            return True
-
-            # STEP 2
-            # we must look at the square root...
-        norm = isqrt(normsq)            # integer square root (Python >= 3.8)
-        if norm * norm != normsq:
-            return False                # not a perfect square so not prime
-
-            # STEP 3
-            # normsq is a perfect square
-            # for the number to be a Gaussian prime, the norm must be
-            # BOTH congruent to three modulo 4 AND an ordinary prime
-        return norm % 4 == 3 and self._primes.is_prime(norm)
+        return _gaussian_is_prime(self._a, self._b)
+
+    @classmethod
+    def batch_is_prime(cls, gints):
+        """test several Gaussian integers for primality
+
+        REQUIRED ARGUMENTS
+
+            gints - an iterable of Gaussian integers
+
+        RETURN VALUE
+
+            a list of the individual is_prime results, in order
+
+        DESCRIPTION
+
+            The ordinary-prime sieve is extended once, up to the
+            largest norm square (capped at the sieve's own query
+            limit), before any candidate is tested; the per-candidate
+            checks then run against the finished sieve instead of
+            growing it piecemeal.
+        """
+        primes = _get_primality().primes    # primality.py is required
+        gints = list(gints)
+        if gints:
+            largest = max(u._a * u._a + u._b * u._b for u in gints)
+            primes.sieve(min(largest, primes.SIEVE_LIMIT))
+        return [u.is_prime for u in gints]
+
+@lru_cache(maxsize=None)
+def _gaussian_is_prime(a:int, b:int) -> bool:
+    """decide whether a+bi is a Gaussian prime
+
+    The result is cached by the pair (a, b), so sweeps that revisit
+    the same Gaussian integers pay for the primality tests only once.
+    """
+    primes = _get_primality().primes    # primality.py is required
+    normsq = a*a + b*b
+
+        # STEP 1
+        # if the norm-square is prime, then the number is prime
+    if primes.is_prime(normsq):
+        return True
+
+        # STEP 2
+        # we must look at the square root...
+    norm = isqrt(normsq)                # integer square root (Python >= 3.8)
+    if norm * norm != normsq:
+        return False                    # not a perfect square so not prime
+
+        # STEP 3
+        # normsq is a perfect square
+        # for the number to be a Gaussian prime, the norm must be
+        # BOTH congruent to three modulo 4 AND an ordinary prime
+    return norm % 4 == 3 and primes.is_prime(norm)
+
+def gaussian_is_prime(a:int, b:int) -> bool:
+    """test whether a+bi is a Gaussian prime from the raw parts
+
+    Scans that reject most candidates can call this without
+    constructing a GaussianInt; the result cache is shared with
+    GaussianInt.is_prime.
+    """
+    return _gaussian_is_prime(a, b)
+
+    # the four Gaussian units, built once -- membership tests against
+    # this set replace the per-call set construction in is_unit and
+    # is_associate
+_GAUSSIAN_UNITS = frozenset({GaussianInt(1), GaussianInt(-1),
+                             GaussianInt(0, 1), GaussianInt(0, -1)})
 
 def normsq(u):
     """a safer way to compute the norm squared"""
-    return u.real ** 2 + u.imag ** 2
+    a, b = u.real, u.imag
+    return a*a + b*b
 
 def GaussianGCD(*args, maxiters=100, warnings=True,
                 debug=False, quotients=False,
@@ -994,9 +1184,10 @@ if __name__ == "__main__":
     print("\tGaussian primes whose norms are less than or equal to 10:")
     for i in range(0, 10):
         for j in range(0, 10):
+            nsq = i*i + j*j         # filter on the norm square before
+            if nsq > 100:           #   building any objects
+                continue            # (sic!) norm > 10 ignored (10^2=100)
             u = GaussianInt(i, j)
-            if u.normsq() > 100:     # (sic!) norm > 10 ignored (10^2=100)
-                continue
             if not u.is_prime:
                 continue
             if u == 0:
@@ -1004,15 +1195,15 @@ if __name__ == "__main__":
                 continue
             if u.imag == 0:
                 print(f"\t  u={GaussianInt(i)}, {GaussianInt(-i)}; " \
-                    + f"\t|u|={isqrt(u.normsq())}, |u|^2={u.normsq()}")
+                    + f"\t|u|={isqrt(nsq)}, |u|^2={nsq}")
                 continue
             if u.real == 0:
                 print(f"\t  u={GaussianInt(i,j)}, {GaussianInt(i,-j)}; " \
-                    + f"\t|u|={isqrt(u.normsq())}, |u|^2={u.normsq()}")
+                    + f"\t|u|={isqrt(nsq)}, |u|^2={nsq}")
                 continue
             print(f"\t  u={GaussianInt(i,j)}, {GaussianInt(i,-j)}, " \
                 + f"{GaussianInt(-i, j)}, {GaussianInt(-i,-j)};  " \
-                + f"\t|u|={sqrt(u.normsq()):.5f}, |u|^2={u.normsq()}")
+                + f"\t|u|={sqrt(nsq):.5f}, |u|^2={nsq}")
             assert GaussianInt(i, -j).is_prime
             assert GaussianInt(-i, j).is_prime
             assert GaussianInt(-i, -j).is_prime
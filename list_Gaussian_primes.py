@@ -24,49 +24,94 @@ LICENSE
     TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE
     SOFTWARE OR THE USE OR OTHER DEALINGS IN THE SOFTWARE.
 """
+import sys
+from heapq import merge
+from itertools import chain
 from math import sqrt, isqrt      # isqrt (int sqrt) requires Python >= 3.8
 
 from primality import primes
 from gaussian_int import GaussianInt, normsq
 
+def cornacchia(p):
+    """solve a^2 + b^2 = p for an ordinary prime p = 1 (mod 4)
+
+    Fermat's two-square theorem guarantees a solution.  A square root
+    x of -1 modulo p is found by raising a quadratic non-residue t to
+    the power (p-1)/4; Euclidean reduction of the pair (p, x) then
+    yields the representative below sqrt(p).
+
+    RETURN VALUE
+
+        the pair (a, b) with a > b > 0 and a^2 + b^2 = p
+    """
+    e = (p - 1) // 4
+    if p % 8 == 5:                  # 2 is a non-residue exactly when
+        x = pow(2, e, p)            #   p = 5 (mod 8): no search needed
+    else:
+        t = 3                       # find a square root of -1 (mod p);
+        while True:                 #   one pow per candidate, verified
+            x = pow(t, e, p)        #   by squaring
+            if x * x % p == p - 1:
+                break
+            t += 2
+    limit = isqrt(p)
+    a, b = p, x
+    while b > limit:                # Euclidean reduction
+        a, b = b, a % b
+    a = b
+    b = isqrt(p - a*a)
+    return (a, b) if a > b else (b, a)
+
 def make_comma(csv=False):
     """build a comma"""
     return "," if csv else "\t"
 
 def make_heading(csv=False, quadrant1=False, primes_only=False):
     """prepare the heading"""
-    s = ""
-    comma = make_comma(csv)
-    if not primes_only:
-        s += "norm" + comma
-    s += "I"
+    columns = [] if primes_only else ["norm"]
+    columns.append("I")
     if not quadrant1:
-        s += comma + "II"
-        s += comma + "III"
-        s += comma + "IV"
-    return s
+        columns.extend(("II", "III", "IV"))
+    return make_comma(csv).join(columns)
 
-def make_detail(p, csv=False, quadrant1=False, primes_only=False,
-                round_to=3):
-    """prepare the line for Gaussian prime p"""
+def make_detail(p, p_dot_p=None, csv=False, quadrant1=False,
+                primes_only=False, round_to=3):
+    """prepare the line for Gaussian prime p
+
+    The caller may pass the norm square as p_dot_p; build_list
+    already carries it in each item, so it need not be recomputed
+    here.
+    """
 
     s = ""
     comma = make_comma(csv)
     if not primes_only:                 # |p| is an integer
-        p_dot_p = normsq(p)
+        if p_dot_p is None:
+            p_dot_p = normsq(p)
         n = isqrt(p_dot_p)
         if n * n == p_dot_p:
             s += str(n) + comma
         else:                           # |p| is not an integer
-            fmt = "%%.%df%s" % (round_to, comma)
+            key = (round_to, comma)
+            fmt = make_detail._formats.get(key)
+            if fmt is None:             # build each format just once
+                fmt = "%%.%df%s" % key
+                make_detail._formats[key] = fmt
             s += fmt % sqrt(p_dot_p)
     s += str(p)
     if not quadrant1:
-        s += comma + str(p * GaussianInt(0,-1)) # second quadrant
-        s += comma + str(-p)                    # third quadrant
-        s += comma + str(p * GaussianInt(0,1))  # fourth quadrant
+            # invariant: multiplication by a unit preserves primality,
+            # so the associates are emitted without re-testing; a unit
+            # just permutes and flips the parts:
+            #   (a+bi)(-i) = b-ai and (a+bi)i = -b+ai
+        a, b = p.real, p.imag
+        s += comma + str(GaussianInt(b, -a))    # second quadrant
+        s += comma + str(GaussianInt(-a, -b))   # third quadrant
+        s += comma + str(GaussianInt(-b, a))    # fourth quadrant
     return s
 
+make_detail._formats = {}       # cache of norm-column formats
+
 def build_list(maximum, csv=False, unsorted=False, quadrant1=False,
                primes_only=False, round_to=3, to_string=False):
     """
@@ -81,7 +126,9 @@ def build_list(maximum, csv=False, unsorted=False, quadrant1=False,
         csv         if True, the output will be in comma-separated variable
                 format.
 
-        unsorted    if True, the output will not be sorted.
+        unsorted    if True, the output will not be sorted; the
+                primes then appear in ascending order of the ordinary
+                prime each one divides.
 
         quadrant1   if True, the second, third and fourth quadrant primes
                 the negative primes, and the pure imaginary primes will
@@ -103,38 +150,66 @@ def build_list(maximum, csv=False, unsorted=False, quadrant1=False,
                 If False (default), output will be displayed to standard
                 output.
     """
-    items = []
-    items.append((0, 0, 0))
-
-    n = 1
+        # Every Gaussian prime in the first quadrant divides exactly
+        # one ordinary prime p: for p=2 the prime is 1+i, for
+        # p = 1 (mod 4) the primes are the two conjugate solutions of
+        # a^2 + b^2 = p, and for p = 3 (mod 4) the prime is p itself
+        # with norm square p^2.  Sieving the ordinary primes up to
+        # maximum^2 and factoring each one directly replaces a
+        # primality test on every lattice point.
     maxsq = maximum ** 2
-    for b in range(maximum):                
-        for a in range(1, maximum+1):       # real part > 0
-            c = GaussianInt(a, b)
-            enorm = normsq(c)
-            if enorm > maxsq:
-                break
-            if c.is_prime:
-                items.append((enorm, n, c))
-                n += 1
-
-    if not unsorted:
-        items.sort()
-
-    lines = make_heading(csv=csv, quadrant1=quadrant1,
-                         primes_only=primes_only)
-    if not to_string:
-        print(lines)
-        lines = ""
-
-    for item in items:
-        enorm, _, p = item          # unpack
-        lines += make_detail(p, csv=csv, quadrant1=quadrant1,
-                             primes_only=primes_only, round_to=round_to)
-        if not to_string:
-            print(lines)
-            lines = ""
-    return lines
+    primes.sieve(maxsq)
+    rational = [2] if maxsq >= 2 else []
+    for p in primes.odd_primes_list:
+        if p > maxsq:
+            break
+        rational.append(p)
+
+    def gaussian_factors(ps):
+        """emit (norm square, Gaussian prime) for ordinary primes ps
+
+        Only the first-quadrant representative is emitted; its three
+        associates are prime as well (unit multiples of a prime are
+        prime) and are reconstructed by the formatter without any
+        further testing.
+        """
+        for p in ps:
+            if p == 2:
+                yield (2, GaussianInt(1, 1))
+            elif p % 4 == 1:        # p = a^2 + b^2: two conjugates
+                a, b = cornacchia(p)
+                yield (p, GaussianInt(a, b))
+                yield (p, GaussianInt(b, a))
+            elif p <= maximum:      # p = 3 (mod 4): norm square p^2
+                yield (p*p, GaussianInt(p, 0))
+
+    if unsorted:
+        pairs = gaussian_factors(rational)
+    else:
+            # Split by residue class: each stream is strictly
+            # increasing in norm (norms p versus norms p^2), so a
+            # linear merge replaces the O(N log N) sort.
+        split = (p for p in rational if p % 4 != 3)
+        inert = (p for p in rational if p % 4 == 3)
+        pairs = merge(gaussian_factors(split),
+                      gaussian_factors(inert),
+                      key=lambda pair: pair[0])
+    pairs = chain([(0, 0)], pairs)  # the zero ideal leads the list
+
+        # a lazy pipeline: rows are formatted and written one at a
+        # time, so memory stays flat no matter how large maximum is
+    heading = make_heading(csv=csv, quadrant1=quadrant1,
+                           primes_only=primes_only)
+    details = (make_detail(p, p_dot_p=enorm, csv=csv,
+                           quadrant1=quadrant1,
+                           primes_only=primes_only,
+                           round_to=round_to)
+               for enorm, p in pairs)
+    rows = chain([heading], details)
+    if to_string:
+        return "".join(rows)
+    sys.stdout.writelines(row + "\n" for row in rows)
+    return ""
 
 def main(argv, description=None, epilogue=None):
     """main entry point"""
@@ -171,6 +246,5 @@ def main(argv, description=None, epilogue=None):
                args.quadrant1, args.primes_only, args.round_to)
 
 if __name__ == "__main__":
-    import sys
     main(sys.argv[1:])
 
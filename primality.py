@@ -30,7 +30,9 @@ LICENSE
     # Initially the list includes all single-digit positive primes.
 
 from numbers import Real
-from math import sqrt, log, gcd
+from math import sqrt, log, gcd, isqrt
+from functools import lru_cache
+from operator import index
 
     # We define a "maybe" value for situations where testing is incomplete.
     # Programmers should take care in its use as "Maybe", used by itself as
@@ -39,6 +41,101 @@ from math import sqrt, log, gcd
 Maybe = float("inf")            # True, False, or Maybe
 phi = (1+sqrt(5))/2             # mean-extreme ratio (≈1.618)
 
+    # witnesses for the strong probable prime (Miller-Rabin) test --
+    # testing against all twelve is deterministic for every n below
+    # the bound, a result due to Sorenson and Webster
+
+_MR_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+_MR_DETERMINISTIC_BOUND = 3317044064679887385961981
+
+def _miller_rabin(n:int) -> bool:
+    """
+    strong probable prime test
+
+    ARGUMENTS
+        n - a positive integer
+
+    RETURN VALUE
+        False if n is certainly composite.  True if n passes the
+        strong probable prime test to every witness base: this is a
+        proof of primality for n below _MR_DETERMINISTIC_BOUND
+        (about 3.3e24) and overwhelming evidence beyond it.
+
+    DESCRIPTION
+        Write n-1 = d 2^r with d odd.  For each witness a, n passes
+        if a^d = 1 (mod n) or a^(d 2^k) = -1 (mod n) for some k < r.
+        An odd prime passes for every base; a composite fails for at
+        least three quarters of them.  The modular powering is a
+        single call to the built-in pow.
+    """
+    if n < 2:
+        return False
+    for p in _MR_WITNESSES:
+        if n % p == 0:
+            return n == p
+    d = n - 1
+    r = (d & -d).bit_length() - 1   # the exact power of 2 in n-1
+    d >>= r
+    for a in _MR_WITNESSES:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False            # a witnesses that n is composite
+    return True
+
+def _pollard_rho(n:int) -> int:
+    """
+    find a nontrivial divisor of an odd composite number
+
+    ARGUMENTS
+        n - an odd composite integer greater than 1 which is not
+            divisible by any prime in the small primes list
+
+    RETURN VALUE
+        a divisor d of n with 1 < d < n (not necessarily prime)
+
+    DESCRIPTION
+        This is Brent's variant of Pollard's rho method.  The orbit
+        of x -> x^2 + c (mod n) falls into a cycle modulo each prime
+        divisor p after O(sqrt(p)) steps; a gcd of n with a running
+        product of orbit differences exposes the divisor.  Products
+        are accumulated in batches so that only one gcd is taken per
+        batch of squarings.
+    """
+    c = 1
+    while True:                     # over polynomials x^2 + c
+        y, r, q, g = 2, 1, 1, 1
+        m = 128                     # batch size for gcd accumulation
+        x = ys = y
+        while g == 1:
+            x = y
+            for _ in range(r):
+                y = (y * y + c) % n
+            k = 0
+            while k < r and g == 1:
+                ys = y
+                for _ in range(min(m, r - k)):
+                    y = (y * y + c) % n
+                    q = q * abs(x - y) % n
+                g = gcd(q, n)
+                k += m
+            r <<= 1                 # Brent doubling
+        if g == n:
+                # the batch overshot: replay it one step at a time
+            g = 1
+            y = ys
+            while g == 1:
+                y = (y * y + c) % n
+                g = gcd(abs(x - y), n)
+        if g != n:
+            return g
+        c += 1                      # rare: the whole orbit collapsed
+
 class Primes(object):
     """
     manage a list of known "small" primes
@@ -70,6 +167,32 @@ class Primes(object):
     odd_primes_list = [3, 5, 7]
     small_primes_set = {2, 3, 5, 7}
     last_tested = 9
+    _last_tested_sq = 81            # cached square of last_tested
+
+        # a packed bit table of the odd primes: bit i (that is, bit
+        # i&7 of byte i>>3) is set when 2i+1 is prime.  Sixteen odd
+        # numbers per byte, so membership costs one indexed load
+        # instead of hashing a (possibly large) integer into the set.
+        # The initial byte records 3, 5 and 7 (bits 1, 2 and 3).
+    _prime_bits = bytearray((0b00001110,))
+
+        # the odd primes, batched into primorial blocks: each block is
+        # the product of a run of consecutive odd primes, kept below
+        # 64 bits so a gcd against it stays a cheap few-word
+        # operation.  One gcd tests a whole run of primes at once, so
+        # trial division over the full list costs a handful of gcds
+        # instead of a division (and a branch) per prime.  The counts
+        # list records how many primes went into each block, and
+        # _blocks_k is the total folded so far.
+    _primorial_blocks = []
+    _block_counts = []
+    _blocks_k = 0
+
+        # primality queries will not grow the sieve past this bound on
+        # their own -- sieving to a huge n takes O(n) time and memory,
+        # while the probable prime test answers in microseconds.  An
+        # explicit call to sieve can still go as far as it likes.
+    SIEVE_LIMIT = 10**6
 
     @classmethod
     def sieve(cls, stop:int):
@@ -87,22 +210,110 @@ class Primes(object):
         if not stop:
             return                          # nothing to do if stop is False
 
-        if not isinstance(stop, Real):
-            raise TypeError("The stop value must be a real number")
-        stop = abs(stop)
-
-            # the sieve of Eratosthenes
-
-        while stop > cls.last_tested:
-            cls.last_tested += 2            # odd values only!
-            is_prime = True                 # assume prime
+        try:
+                # the common case: an integer stop.  operator.index
+                # is one C call, with none of the abstract-base-class
+                # dispatch of an isinstance check against the numeric
+                # tower.
+            stop = abs(index(stop))
+        except TypeError:
+            if not isinstance(stop, Real):
+                raise TypeError("The stop value must be a real number") \
+                    from None
+            stop = abs(stop)
+            if stop != int(stop):
+                stop = int(stop) + 1        # round a fractional stop up
+            else:
+                stop = int(stop)
+        if stop <= cls.last_tested:
+            return                          # already sieved this far
+
+            # the last tested value stays odd and advances in steps
+            # of two, exactly as if each candidate had been tested
+            # one at a time
+        new_last = cls.last_tested + ((stop - cls.last_tested + 1) >> 1 << 1)
+
+            # make sure the base primes reach the square root of the
+            # new bound; the recursion bottoms out at once since the
+            # square root of the square root is tiny
+        root = isqrt(new_last)
+        if root > cls.last_tested:
+            cls.sieve(root)
+
+            # the sieve of Eratosthenes, odd numbers only and
+            # segmented: byte i of a segment starting at lo stands for
+            # the odd number lo+2i.  Each segment is small enough to
+            # stay cache-resident while every base prime strides
+            # across it, and only the untested gap is sieved -- the
+            # numbers below last_tested are never revisited.
+        SEGMENT = 1 << 15               # 32K odd numbers per segment
+        new = []                        # primes beyond the old bound
+        lo = cls.last_tested + 2        # first untested odd number
+        while lo <= new_last:
+            hi = min(lo + 2 * (SEGMENT - 1), new_last)  # inclusive
+            length = ((hi - lo) >> 1) + 1
+            seg = bytearray(b"\x01") * length
             for p in cls.odd_primes_list:
-                if cls.last_tested % p == 0:
-                    is_prime = False            # composite
+                if p * p > hi:
                     break
-            if is_prime:
-                cls.odd_primes_list.append(cls.last_tested)
-                cls.small_primes_set.add(cls.last_tested)
+                start = p * p           # smaller multiples have a
+                if start < lo:          #   smaller prime factor
+                        # first odd multiple of p at or beyond lo
+                    start = lo + (p - lo % p) % p
+                    if start % 2 == 0:
+                        start += p
+                idx = (start - lo) >> 1
+                if idx < length:
+                    seg[idx::p] = bytes(len(range(idx, length, p)))
+            new.extend(lo + (i << 1) for i in range(length) if seg[i])
+            lo = hi + 2
+
+        cls.odd_primes_list.extend(new)
+        cls.small_primes_set.update(new)
+
+            # grow the packed bit table (new bytes start all zero,
+            # i.e. composite) and record the new primes
+        half = (new_last + 2) >> 1      # bits needed: odds 1..new_last
+        cls._prime_bits.extend(bytes(((half + 7) >> 3)
+                                     - len(cls._prime_bits)))
+        for q in new:
+            i = q >> 1
+            cls._prime_bits[i >> 3] |= 1 << (i & 7)
+        cls.last_tested = new_last
+        cls._last_tested_sq = new_last * new_last
+
+    @classmethod
+    def _refresh_blocks(cls):
+        """fold newly sieved primes into the primorial blocks
+
+        Full blocks are never touched again; the last block stays
+        open and keeps absorbing primes as the sieve grows, so a
+        refresh after sieving costs one multiplication per new prime.
+        """
+        opl = cls.odd_primes_list
+        k = cls._blocks_k
+        if k == len(opl):
+            return                      # nothing new to fold
+        blocks = cls._primorial_blocks
+        counts = cls._block_counts
+        if blocks:
+            P = blocks.pop()            # reopen the last block
+            c = counts.pop()
+        else:
+            P, c = 1, 0
+        while k < len(opl):
+            p = opl[k]
+            if P * p < (1 << 64):
+                P *= p
+                c += 1
+            else:
+                blocks.append(P)        # the block is full
+                counts.append(c)
+                P, c = p, 1
+            k += 1
+        blocks.append(P)
+        counts.append(c)
+        cls._blocks_k = k
 
     def __init__(self, sieve_to=1000):
         """
@@ -117,16 +328,38 @@ class Primes(object):
     def is_irreducible(self, n:int, sieve=True) -> (bool, float):
         """
         test whether n is irreducible
+
+        With sieve=True (the default), small values are settled from
+        the sieve table; values beyond SIEVE_LIMIT are settled by
+        trial division against the table and the strong probable
+        prime test, so a large n no longer triggers an O(n) sieve.
+        The answer is then exact below the deterministic witness
+        bound (about 3.3e24) and Maybe for a probable prime beyond
+        it.  With sieve=False, only the already-sieved primes are
+        consulted and distant values come back Maybe.
         """
         if not isinstance(n, int):
             raise TypeError
         n = abs(n)              # ignore the sign
 
-            # if we are allowed to sieve, the answer is simple
+            # if we are allowed to sieve, the answer is simple --
+            # provided the sieve stays a reasonable size
 
         if sieve:
-            self.sieve(n)
-            return n in self.small_primes_set
+            if n <= self.SIEVE_LIMIT or n <= self.last_tested:
+                self.sieve(n)
+                    # probe the packed bit table rather than the set:
+                    # one indexed load in place of hashing the integer
+                if n & 1 == 0 or n < 3:
+                    return n == 2
+                i = n >> 1
+                return bool(self._prime_bits[i >> 3] & (1 << (i & 7)))
+
+                # n is too large to sieve up to.  Stock the table of
+                # trial divisors (never past the cap) and fall through
+                # to the divisor screens below; the probable prime
+                # test settles whatever survives them.
+            self.sieve(min(isqrt(n) + 1, self.SIEVE_LIMIT))
 
             # if we are not allowed to sieve, things are more
             # complicated.
@@ -140,16 +373,29 @@ class Primes(object):
         if n % 2 == 0:
             return False            # even and absolutely larger than 2
 
-        for p in self.odd_primes_list:
-            if n % p == 0:
+            # trial division in bulk: one gcd per primorial block
+            # tests a whole run of consecutive odd primes at once.
+            # A nontrivial gcd always exposes a proper factor, since
+            # n is larger than every folded prime at this point.
+        self._refresh_blocks()
+        for P in self._primorial_blocks:
+            if gcd(n, P) != 1:
                 return False
 
             # if the square root of n is smaller than the largest tested value,
             # then if no tested prime divides n, then n must be prime.
 
-        if n < self.last_tested * self.last_tested:
+        if n < self._last_tested_sq:
             return True
 
+        if sieve:
+                # trial division was inconclusive: the strong probable
+                # prime test is exact below the deterministic witness
+                # bound and a confident Maybe beyond it
+            if not _miller_rabin(n):
+                return False
+            return True if n < _MR_DETERMINISTIC_BOUND else Maybe
+
         return Maybe
 
     def is_prime(self, n:int, sieve=True) -> (bool, float):
@@ -202,95 +448,164 @@ class Primes(object):
         RETURN VALUE
             (e, q) where p^e divides n and q = n / p^e.  The value
             of e is the largest e such that p^e divides n
+
+        DESCRIPTION
+            In the common case p does not divide n at all, so a single
+            remainder settles the matter.  Otherwise the exponent is
+            found by repeated squaring: divisibility is tested against
+            p, p^2, p^4, ... and the exponent is assembled from the
+            binary digits, using O(log e) divisions instead of e of
+            them.
         """
+        if n % p:
+            return (0, n)           # the usual case: p does not divide n
+
+            # square up: powers[k] = p^(2^k), as long as it divides n
+        powers = [p]
+        while n % (powers[-1] * powers[-1]) == 0:
+            powers.append(powers[-1] * powers[-1])
+
+            # peel off the powers from the largest down; after p^(2^k)
+            # is removed, the remaining exponent is less than 2^k, so
+            # each power divides at most once
         e = 0
-        while n % p == 0:
-            e += 1
-            n //= p
+        for k in range(len(powers) - 1, -1, -1):
+            q = powers[k]
+            if n % q == 0:
+                n //= q
+                e += 1 << k
         return (e, n)
 
-    def factor_slow(self, n) -> (list, int):
+    @lru_cache(maxsize=4096)
+    def _factor_abs(self, n:int) -> tuple:
         """
-        returns the unique factorization of n
+        factor a positive integer into prime power pairs
 
         RETURN VALUE
-            A list of prime power factors in ascending order. The
-            list starts with 1 if n is positive and -1 if n is
-            negative.  The remaining entries in the list are pairs
-            of the form [p, e] where p is a positive prime, e is a
-            positive integer and p^e divides n.  There is one such
-            entry for each positive prime divisor of n.  If n is zero,
-            the value 0 is returned.
-        """
-        if not isinstance(n, int):
-            raise TypeError
-        if n == 0:
-            return 0            # zero
+            A tuple of pairs (p, e) in ascending order of p, where p
+            is a positive prime, e is a positive integer, and p^e is
+            the exact power of p dividing n.  For n=1 the tuple is
+            empty.
 
-            # extract the unit
-        unit = 1 if n>0 else -1
-        factors = [unit]
-        n = abs(n)
-        if n == 1:
-            return factors
+        DESCRIPTION
+            This is the core of factor_slow, split out so the result
+            can be memoized: d, sigma, s and every wrapped
+            multiplicative function re-factor the same small integers
+            over and over, and a cache hit turns the whole trial
+            division pass into a dictionary lookup.  The tuples are
+            immutable, so cached results are safe to share between
+            callers.
+        """
+        factors = []
 
             # extract powers of two
         e, n = self.extract_power(n, 2)
         if e > 0:
-            factors.append([2,e])
+            factors.append((2, e))
         if n == 1:
-            return factors          # complete
+            return tuple(factors)       # complete
 
             # extract powers of small odd primes
-            # Since most exponents will be 0, this is slow
-        for p in self.odd_primes_list:
+            # Since most exponents will be 0, this is slow.  When a
+            # gcd against the first primorial block comes back
+            # trivial, the primes in that block cannot divide n and
+            # are skipped outright.
+        self._refresh_blocks()
+        small = self.odd_primes_list
+        if gcd(n, self._primorial_blocks[0]) == 1:
+            small = small[self._block_counts[0]:]
+        for p in small:
             e, n = self.extract_power(n, p)
             if e > 0:
-                factors.append([p,e])
+                factors.append((p, e))
             if n == 1:
-                return factors          # complete
-
-            # at this point we will need to find more factors...
-            # the largest possible proper factor is the square root
-            # of the current value of n, but we might not need to
-            # go that far. Instead, we will try to slowly increase the
-            # size of the largest tested value.
-            # This is the slowest part of the factorization process.
-
-        m = len(self.odd_primes_list)
-        while n > 1:
-            stop = int(self.last_tested * phi)
-            self.sieve(stop)                # extend the small primes
-            while m < len(self.odd_primes_list):
-                p = self.odd_primes_list[m]
-                m += 1
-                e, n = self.extract_power(n, p)
-                if e > 0:
-                    factors.append([p,e])
-                if n == 1:
-                    break
+                return tuple(factors)       # complete
+
+            # at this point the cofactor has no prime divisor up to
+            # last_tested.  Rather than sieve all the way to its
+            # square root (which balloons the prime list when one
+            # large prime remains), finish with a strong probable
+            # prime test and, for composites, Pollard's rho.  Divisors
+            # found this way are recorded in the factorization but are
+            # NOT added to the small primes list, which stays a
+            # gap-free table.
+
+        bound = self._last_tested_sq
+        if n < bound:
+            return tuple(factors + [(n, 1)])    # must be prime
+
+        large = {}                  # prime -> exponent
+        pending = [n]
+        while pending:
+            m = pending.pop()
+            if m < bound or _miller_rabin(m):
+                large[m] = large.get(m, 0) + 1
+            else:
+                d = _pollard_rho(m)
+                pending.append(d)
+                pending.append(m // d)
+        for p in sorted(large):
+            factors.append((p, large[p]))
+        return tuple(factors)
+
+    def factor_slow(self, n) -> tuple:
+        """
+        returns the unique factorization of n
+
+        RETURN VALUE
+            A pair (unit, factors).  The unit is 1 if n is positive,
+            -1 if n is negative, and 0 if n is zero (in which case
+            factors is empty).  The factors entry is a tuple of pairs
+            (p, e) in ascending order of p, where p is a positive
+            prime, e is a positive integer, and p^e is the exact
+            power of p dividing n.
+
+            Everything is an immutable tuple, so the cached result
+            can be handed out directly and consumers can unpack the
+            pairs without inspecting their types.  Callers that want
+            the older flat list format [unit, [p, e], ...] (with the
+            bare value 0 for zero) can pass the result through the
+            _to_old_format adapter.
+        """
+        if not isinstance(n, int):
+            raise TypeError
+        if n == 0:
+            return (0, ())      # zero
 
-        return factors
+        unit = 1 if n>0 else -1
+        return (unit, self._factor_abs(abs(n)))
 
     @staticmethod
-    def multiply(factors:(list,int)) -> int:
-        """multiply a list of factors"""
-        if factors == 0:
+    def _to_old_format(result:tuple) -> (list, int):
+        """
+        convert a (unit, factors) pair to the old flat list format
+
+        Older callers expect [unit, [p, e], ...], with the bare value
+        0 standing for zero.  Fresh inner lists are built on every
+        call so that mutating them cannot corrupt the cached tuples.
+        """
+        unit, pairs = result
+        if unit == 0:
             return 0
-        if not isinstance(factors, list):
-            raise TypeError("Require factor list")
-        n = 1
-        for factor in factors:
-            if isinstance(factor, list):
-                p, e = factor
-                if not isinstance(e, int):
-                    raise TypeError("Require integer exponent")
-                if e < 0:
-                    raise ValueError("Exponent may not be negative")
-                for _ in range(e):
-                    n *= p
-            else:
-                n *= factor
+        return [unit] + [[p, e] for p, e in pairs]
+
+    @staticmethod
+    def multiply(factors:tuple) -> int:
+        """multiply a factored value back together"""
+        if not isinstance(factors, tuple):
+            raise TypeError("Require a (unit, factors) pair")
+        unit, pairs = factors
+        if unit == 0:
+            return 0
+        n = unit
+        for p, e in pairs:
+            if not isinstance(e, int):
+                raise TypeError("Require integer exponent")
+            if e < 0:
+                raise ValueError("Exponent may not be negative")
+                # the built-in power uses binary exponentiation:
+                # O(log e) multiplications instead of e of them
+            n *= p ** e
         return n
 
     def d(self, n:int) -> int:
@@ -314,18 +629,16 @@ class Primes(object):
         if n == 1:
             return 1        # units 1 and -1 each have one positive divisor
 
-        factors = self.factor_slow(n)
+        _, pairs = self.factor_slow(n)
         divisors = 1
-        for factor in factors:
+        for p, e in pairs:          # we use the fact that p is prime
                 # here we use the multiplicative property.
                 #   (1) the set of divisors of p^e, where p is prime, is
                 #       {p^0, p^1, p^2, ..., p^e}, so the number of divisors
                 #       is e+1; and
                 #   (2) if m and n are relatively prime, then:
                 #           d(mn) = d(m) d(n)
-            if isinstance(factor, list):
-                p, e = factor       # we use the fact that p is prime
-                divisors *= e+1     # (1) e+1 divisors of p^e; (2) multiply
+            divisors *= e+1         # (1) e+1 divisors of p^e; (2) multiply
         return divisors
 
     def sigma(self, n:int, k=1) -> (int, float, complex):
@@ -368,16 +681,14 @@ class Primes(object):
         if n == 1:                      # a unit was entered
             return s
 
-        factors = self.factor_slow(n)
-        for factor in factors:
+        _, pairs = self.factor_slow(n)
+        for p, e in pairs:          # we use the fact that p is prime
             t, a = 0, 1             # t is the sum, a is the next term
-            if isinstance(factor, list):
-                p, e = factor       # we use the fact that p is prime
-                m = p**k            # geometric sequence multiplier
-                for f in range(e+1):
-                    t += a          # add p^f
-                    a *= m          # now a=p^(f+1)
-                s *= t              # multiplicative property
+            m = p**k                # geometric sequence multiplier
+            for f in range(e+1):
+                t += a              # add p^f
+                a *= m              # now a=p^(f+1)
+            s *= t                  # multiplicative property
         return s
 
     def s(self, n:int) -> int:
@@ -448,10 +759,9 @@ def multiplicative(minus1=-1, zero=0):
                 return zero
             retval = 1 if n>0 else minus1
             n = abs(n)
-            factors = primes.factor_slow(n)
-            for factor in factors:
-                if isinstance(factor, list):    # factor = [p, e]
-                    retval *= f(*factor)
+            _, pairs = primes.factor_slow(n)
+            for pair in pairs:                  # pair = (p, e)
+                retval *= f(*pair)
             return retval
 
         wrapped_f.doc = docstring
@@ -581,6 +891,102 @@ def totient(p:int, e:int) -> int:
     n = p**e
     return n - n // p
 
+def _smallest_prime_factors(limit:int) -> list:
+    """
+    linear sieve for smallest prime factors
+
+    ARGUMENTS
+
+        limit - the table covers 0 through limit inclusive
+
+    RETURN VALUE
+
+        a list spf with spf[n] the smallest prime factor of n for
+        n>=2; entries 0 and 1 are 0 as neither has a prime factor
+
+    DESCRIPTION
+
+        This is the classical linear sieve: each composite i*p is
+        crossed off exactly once, by its smallest prime factor p, so
+        the whole table is built in O(limit) arithmetic operations.
+    """
+    spf = [0] * (limit + 1)
+    small = []                      # primes found so far, ascending
+    for i in range(2, limit + 1):
+        if spf[i] == 0:
+            spf[i] = i              # i is prime
+            small.append(i)
+        for p in small:
+            if p > spf[i] or i * p > limit:
+                break
+            spf[i * p] = p          # p is the least factor of i*p
+    return spf
+
+def batch_totient(limit:int) -> list:
+    """
+    table of Euler's totient for 0 through limit
+
+    RETURN VALUE
+
+        a list tbl with tbl[n] the totient of n; tbl[0] is 0
+
+    DESCRIPTION
+
+        Calling totient(n) for every n up to the limit pays for one
+        factorization per entry.  Here a linear sieve finds each
+        smallest prime factor once, and the table is then filled by
+        the recurrence
+
+            phi(n) = phi(n/p) * p      if p^2 divides n,
+            phi(n) = phi(n/p) * (p-1)  otherwise,
+
+        where p is the smallest prime factor of n -- one multiplication
+        per entry instead of one factorization.
+    """
+    if not isinstance(limit, int):
+        raise TypeError
+    spf = _smallest_prime_factors(limit)
+    tbl = [0] * (limit + 1)
+    if limit >= 1:
+        tbl[1] = 1
+    for n in range(2, limit + 1):
+        p = spf[n]
+        m = n // p
+        tbl[n] = tbl[m] * p if m % p == 0 else tbl[m] * (p - 1)
+    return tbl
+
+def batch_mobius(limit:int) -> list:
+    """
+    table of the Moebius function for 0 through limit
+
+    RETURN VALUE
+
+        a list tbl with tbl[n] equal to 0 if n has a square factor
+        and (-1)^k if n is a product of k distinct primes; tbl[0]
+        is 0 and tbl[1] is 1
+
+    DESCRIPTION
+
+        Built from the same linear sieve as batch_totient, using the
+        recurrence
+
+            mu(n) = 0        if p^2 divides n,
+            mu(n) = -mu(n/p) otherwise,
+
+        where p is the smallest prime factor of n.
+    """
+    if not isinstance(limit, int):
+        raise TypeError
+    spf = _smallest_prime_factors(limit)
+    tbl = [0] * (limit + 1)
+    if limit >= 1:
+        tbl[1] = 1
+    for n in range(2, limit + 1):
+        p = spf[n]
+        m = n // p
+        tbl[n] = 0 if m % p == 0 else -tbl[m]
+    return tbl
+
 if __name__ == "__main__":
     print(f"Testing {__file__}.")
     # print("primes =", sorted(list(primes.small_primes_set)))
@@ -621,7 +1027,13 @@ if __name__ == "__main__":
         # test factorization
     factors = primes.factor_slow(360)
     # print(360, "factors =", factors)
+    assert factors == (1, ((2, 3), (3, 2), (5, 1)))
     assert primes.multiply(factors) == 360
+        # the legacy flat list format is still available on request
+    assert primes._to_old_format(factors) == [1, [2, 3], [3, 2], [5, 1]]
+    assert primes._to_old_format(primes.factor_slow(-12)) \
+        == [-1, [2, 2], [3, 1]]
+    assert primes._to_old_format(primes.factor_slow(0)) == 0
     n = 997*997*360
     factors = primes.factor_slow(n)
     # print(n, "factors =", factors)
@@ -691,6 +1103,21 @@ if __name__ == "__main__":
         assert totient(-x) == -y, f"EXPECTED: φ({-x})={-y}, GOT {totient(-x)}"
     assert totient(0) == 0
 
+    print("Testing the batch tables...")
+        # the tables must agree with the one-at-a-time functions
+    tbl = batch_totient(200)
+    for n in range(1, 201):
+        assert tbl[n] == totient(n), f"EXPECTED: φ({n})={totient(n)}"
+    tbl = batch_mobius(200)
+    for n in range(1, 201):
+            # mu(n) is nonzero exactly when n is squarefree
+        assert (tbl[n] != 0) == bool(square_free(n)), f"AT {n}"
+        # spot checks: mu on primes, squares and products
+    assert tbl[1] == 1
+    assert tbl[2] == -1 and tbl[3] == -1 and tbl[5] == -1
+    assert tbl[4] == 0 and tbl[9] == 0 and tbl[12] == 0
+    assert tbl[6] == 1 and tbl[10] == 1 and tbl[30] == -1
+
         # brute force calculation of φ(360)
     m = 0                   # counter
     for k in range(1,361):